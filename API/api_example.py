@@ -22,7 +22,10 @@ async def main():
     print(f"Public URL: {http_tunnel.public_url}")
 
     # Run the FastAPI app
-    config = uvicorn.Config(app=app, host="127.0.0.1", port=8000, log_level="info")
+    config = uvicorn.Config(
+        app=app, host="127.0.0.1", port=8000, log_level="info",
+        http="httptools"
+    )
     server = uvicorn.Server(config)
     await server.serve()
 
@@ -10,6 +10,8 @@ def start_server(port=8002):
             'python3', '-m', 'uvicorn', 
             'assignment_1:app', 
             '--port', str(port), 
+            '--loop', 'uvloop',
+            '--http', 'httptools',
             '--reload'
         ])
     except KeyboardInterrupt:
@@ -1,9 +1,20 @@
 from typing import List, Optional
 from fastapi import HTTPException
-from sqlmodel import Session, select
 from app.models import Product, Order, ProductCreate, ProductUpdate, OrderCreate, OrderUpdate, OrderStatus
 from app.database import memory_store
-from datetime import datetime
+from datetime import datetime, timezone
+
+
+# Allowed order status transitions; SHIPPED and CANCELED are final
+_VALID_TRANSITIONS = {
+    OrderStatus.PENDING: frozenset((OrderStatus.PAID, OrderStatus.CANCELED)),
+    OrderStatus.PAID: frozenset((OrderStatus.SHIPPED, OrderStatus.CANCELED)),
+    OrderStatus.SHIPPED: frozenset(),
+    OrderStatus.CANCELED: frozenset(),
+}
+
+# Order statuses that keep a product from being deleted
+_BLOCKING_FOR_PRODUCT_DELETE = frozenset((OrderStatus.PENDING, OrderStatus.PAID))
 
 
 class ProductCRUD:
@@ -13,14 +24,15 @@ class ProductCRUD:
     def create_product(product_data: ProductCreate) -> Product:
         """Create a new product"""
         # Check for duplicate SKU
-        if any(p.sku == product_data.sku for p in memory_store.products.values()):
+        if product_data.sku in memory_store.sku_index:
             raise HTTPException(status_code=409, detail="Product with this SKU already exists")
         
-        product = Product(
+        product = Product.construct(
             id=memory_store.product_counter,
             **product_data.dict()
         )
         memory_store.products[product.id] = product
+        memory_store.sku_index[product.sku] = product.id
         memory_store.product_counter += 1
         return product
     
@@ -42,15 +54,23 @@ class ProductCRUD:
         """Update product"""
         product = ProductCRUD.get_product(product_id)
         
+        old_sku = product.sku
+        
         # Check for duplicate SKU if updating SKU
-        if product_data.sku and product_data.sku != product.sku:
-            if any(p.sku == product_data.sku for p in memory_store.products.values()):
+        if product_data.sku and product_data.sku != old_sku:
+            if product_data.sku in memory_store.sku_index:
                 raise HTTPException(status_code=409, detail="Product with this SKU already exists")
         
-        # Update fields that are provided
-        update_data = product_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(product, field, value)
+        # Update fields that are provided; a null SKU keeps the current one
+        for field in product_data.__fields_set__:
+            if field == "sku" and product_data.sku is None:
+                continue
+            setattr(product, field, getattr(product_data, field))
+        
+        # Keep the SKU index in sync
+        if product.sku != old_sku:
+            memory_store.sku_index.pop(old_sku, None)
+            memory_store.sku_index[product.sku] = product.id
         
         return product
     
@@ -61,17 +81,15 @@ class ProductCRUD:
             raise HTTPException(status_code=404, detail="Product not found")
         
         # Check if product has pending orders
-        pending_orders = [
-            order for order in memory_store.orders.values()
-            if order.product_id == product_id and order.status in [OrderStatus.PENDING, OrderStatus.PAID]
-        ]
-        if pending_orders:
+        if memory_store.active_orders_by_product[product_id]:
             raise HTTPException(
                 status_code=400, 
                 detail="Cannot delete product with pending or paid orders"
             )
         
-        del memory_store.products[product_id]
+        product = memory_store.products.pop(product_id)
+        memory_store.sku_index.pop(product.sku, None)
+        memory_store.active_orders_by_product.pop(product_id, None)
         return True
 
 
@@ -93,14 +111,18 @@ class OrderCRUD:
         # Atomically reduce stock and create order
         product.stock -= order_data.quantity
         
-        order = Order(
+        order = Order.construct(
             id=memory_store.order_counter,
             **order_data.dict(),
-            created_at=datetime.utcnow()
+            created_at=datetime.now(timezone.utc)
         )
         memory_store.orders[order.id] = order
         memory_store.order_counter += 1
         
+        # Count active orders against the product for delete checks
+        if order.status in _BLOCKING_FOR_PRODUCT_DELETE:
+            memory_store.active_orders_by_product[order.product_id] += 1
+        
         return order
     
     @staticmethod
@@ -120,26 +142,22 @@ class OrderCRUD:
     def update_order(order_id: int, order_data: OrderUpdate) -> Order:
         """Update order (mainly status)"""
         order = OrderCRUD.get_order(order_id)
+        was_active = order.status in _BLOCKING_FOR_PRODUCT_DELETE
         
         # Validate status transitions
-        if order_data.status:
-            valid_transitions = {
-                OrderStatus.PENDING: [OrderStatus.PAID, OrderStatus.CANCELED],
-                OrderStatus.PAID: [OrderStatus.SHIPPED, OrderStatus.CANCELED],
-                OrderStatus.SHIPPED: [],  # Final state
-                OrderStatus.CANCELED: []  # Final state
-            }
-            
-            if order_data.status not in valid_transitions.get(order.status, []):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid status transition from {order.status} to {order_data.status}"
-                )
+        if order_data.status and order_data.status not in _VALID_TRANSITIONS.get(order.status, frozenset()):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status transition from {order.status} to {order_data.status}"
+            )
         
         # Update fields
-        update_data = order_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(order, field, value)
+        for field in order_data.__fields_set__:
+            setattr(order, field, getattr(order_data, field))
+        
+        # Valid transitions never re-enter PENDING/PAID, so only count exits
+        if was_active and order.status not in _BLOCKING_FOR_PRODUCT_DELETE:
+            memory_store.active_orders_by_product[order.product_id] -= 1
         
         return order
     
@@ -148,19 +166,23 @@ class OrderCRUD:
         """Cancel order and restore stock if not yet paid"""
         order = OrderCRUD.get_order(order_id)
         
-        if order.status in [OrderStatus.SHIPPED, OrderStatus.CANCELED]:
+        # Canceling twice is a no-op
+        if order.status == OrderStatus.CANCELED:
+            return True
+        if order.status == OrderStatus.SHIPPED:
             raise HTTPException(
                 status_code=400,
                 detail=f"Cannot cancel order with status: {order.status}"
             )
         
-        # Restore stock if order is being canceled and not yet shipped
-        if order.status != OrderStatus.SHIPPED:
-            product = ProductCRUD.get_product(order.product_id)
-            product.stock += order.quantity
+        # Restore stock; the product exists since it can't be deleted while
+        # it has PENDING/PAID orders
+        product = memory_store.products[order.product_id]
+        product.stock += order.quantity
         
         # Set order status to canceled
         order.status = OrderStatus.CANCELED
+        memory_store.active_orders_by_product[order.product_id] -= 1
         return True
     
     @staticmethod
@@ -1,34 +1,13 @@
-import os
-from sqlmodel import SQLModel, create_engine, Session
-from app.models import Product, Order
+from collections import Counter
 
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./orders_inventory.db")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # Set to True for SQL debugging
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
-
-
-def create_db_and_tables():
-    """Create database tables"""
-    SQLModel.metadata.create_all(engine)
-
-
-def get_session():
-    """Get database session"""
-    with Session(engine) as session:
-        yield session
-
-
-# In-memory storage as fallback (for demo purposes)
+# In-memory storage (for demo purposes)
 class InMemoryStore:
     def __init__(self):
         self.products = {}
         self.orders = {}
+        self.sku_index = {}  # sku -> product id, kept in sync with products
+        self.active_orders_by_product = Counter()  # product id -> PENDING/PAID orders
         self.product_counter = 1
         self.order_counter = 1
         
@@ -36,6 +15,8 @@ class InMemoryStore:
         """Reset all data - useful for testing"""
         self.products.clear()
         self.orders.clear()
+        self.sku_index.clear()
+        self.active_orders_by_product.clear()
         self.product_counter = 1
         self.order_counter = 1
 
@@ -1,21 +1,28 @@
 from fastapi import FastAPI, HTTPException, Request, Header
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional, Dict, Any
+from collections import Counter
 import os
 import hmac
-import hashlib
 import base64
-import json
-from datetime import datetime
+import time
+import msgspec
+from datetime import datetime, timezone
 
 from app.models import (
     Product, Order, ProductCreate, ProductUpdate, ProductResponse,
     OrderCreate, OrderUpdate, OrderResponse, ErrorResponse, OrderStatus,
-    PaymentWebhook
+    PaymentWebhookMsg
 )
 
 # Simple in-memory storage
 products_db: Dict[int, Product] = {}
+sku_index: Dict[str, int] = {}  # sku -> product id, kept in sync with products_db
 orders_db: Dict[int, Order] = {}
+# Pre-built response dicts, refreshed whenever the stored model changes
+products_json: Dict[int, Dict[str, Any]] = {}
+orders_json: Dict[int, Dict[str, Any]] = {}
+product_order_counts: Counter = Counter()  # product id -> number of orders
 product_counter = 0
 order_counter = 0
 
@@ -23,6 +30,7 @@ order_counter = 0
 app = FastAPI(
     title="Orders & Inventory Microservice",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     description="""
     A FastAPI-based microservice for managing products and orders in an online store.
     
@@ -49,20 +57,29 @@ app = FastAPI(
 )
 
 # Webhook security
-def verify_webhook_signature(signature: str, payload: bytes, secret: str) -> bool:
+_WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "webhook-secret-key").encode()
+_SIGNATURE_LENGTH = len('sha256=') + 44  # prefix + base64 of a 32-byte digest
+
+def verify_webhook_signature(signature: str, payload: bytes) -> bool:
     """Verify HMAC-SHA256 signature"""
     if not signature.startswith('sha256='):
         return False
-    
-    expected_signature = hmac.new(
-        secret.encode(),
-        payload,
-        hashlib.sha256
-    ).digest()
-    expected_signature_b64 = base64.b64encode(expected_signature).decode()
+    # Reject malformed signatures before hashing the payload
+    if len(signature) != _SIGNATURE_LENGTH:
+        return False
     
     provided_signature = signature[7:]  # Remove 'sha256=' prefix
-    return hmac.compare_digest(expected_signature_b64, provided_signature)
+    try:
+        provided_bytes = base64.b64decode(provided_signature, validate=True)
+    except ValueError:
+        return False
+    
+    expected_signature = hmac.digest(_WEBHOOK_SECRET, payload, 'sha256')
+    return hmac.compare_digest(expected_signature, provided_bytes)
+
+# Handlers only touch in-memory dicts, so they are async def and run on the
+# event loop. A handler that does blocking I/O (file access, a sync DB
+# session) should be plain def so FastAPI runs it in the threadpool.
 
 # Root endpoint
 @app.get("/", tags=["General"])
@@ -82,38 +99,61 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "orders-inventory",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": time.time(),
         "products_count": len(products_db),
         "orders_count": len(orders_db)
     }
 
 # Product endpoints
-@app.post("/products", response_model=ProductResponse, status_code=201, tags=["Products"])
+@app.post("/products", status_code=201, responses={201: {"model": ProductResponse}}, tags=["Products"])
 async def create_product(product: ProductCreate):
     """Create a new product with unique SKU validation"""
     global product_counter
     
     # Check for duplicate SKU
-    for existing_product in products_db.values():
-        if existing_product.sku == product.sku:
-            raise HTTPException(status_code=409, detail="Product with this SKU already exists")
+    if product.sku in sku_index:
+        raise HTTPException(status_code=409, detail="Product with this SKU already exists")
     
     product_counter += 1
-    new_product = Product(id=product_counter, **product.dict())
+    new_product = Product.construct(id=product_counter, **product.dict())
     products_db[product_counter] = new_product
-    return new_product
+    sku_index[new_product.sku] = product_counter
+    products_json[product_counter] = new_product.dict()
+    return ORJSONResponse(products_json[product_counter], status_code=201)
 
-@app.get("/products", response_model=List[ProductResponse], tags=["Products"])
+@app.post("/products:batch", status_code=201, responses={201: {"model": List[ProductResponse]}}, tags=["Products"])
+async def create_products_batch(products: List[ProductCreate]):
+    """Create several products in one request; nothing is created on a SKU conflict"""
+    global product_counter
+    
+    # Check for duplicate SKUs within the batch and against existing products
+    new_skus = {product.sku for product in products}
+    if len(new_skus) != len(products) or not new_skus.isdisjoint(sku_index):
+        raise HTTPException(status_code=409, detail="Product with this SKU already exists")
+    
+    new_products = {
+        product_id: Product.construct(id=product_id, **product.dict())
+        for product_id, product in enumerate(products, start=product_counter + 1)
+    }
+    product_counter += len(products)
+    
+    new_json = {product_id: p.dict() for product_id, p in new_products.items()}
+    products_db.update(new_products)
+    sku_index.update((p.sku, product_id) for product_id, p in new_products.items())
+    products_json.update(new_json)
+    return ORJSONResponse(list(new_json.values()), status_code=201)
+
+@app.get("/products", responses={200: {"model": List[ProductResponse]}}, tags=["Products"])
 async def get_products():
     """List all products"""
-    return list(products_db.values())
+    return ORJSONResponse(list(products_json.values()))
 
-@app.get("/products/{product_id}", response_model=ProductResponse, tags=["Products"])
+@app.get("/products/{product_id}", responses={200: {"model": ProductResponse}}, tags=["Products"])
 async def get_product(product_id: int):
     """Get a specific product by ID"""
     if product_id not in products_db:
         raise HTTPException(status_code=404, detail="Product not found")
-    return products_db[product_id]
+    return ORJSONResponse(products_json[product_id])
 
 @app.put("/products/{product_id}", response_model=ProductResponse, tags=["Products"])
 async def update_product(product_id: int, product: ProductUpdate):
@@ -122,18 +162,24 @@ async def update_product(product_id: int, product: ProductUpdate):
         raise HTTPException(status_code=404, detail="Product not found")
     
     existing_product = products_db[product_id]
+    old_sku = existing_product.sku
     
     # Check for SKU conflicts if updating SKU
-    if product.sku and product.sku != existing_product.sku:
-        for other_id, other_product in products_db.items():
-            if other_id != product_id and other_product.sku == product.sku:
-                raise HTTPException(status_code=409, detail="Product with this SKU already exists")
+    if product.sku and product.sku != old_sku and product.sku in sku_index:
+        raise HTTPException(status_code=409, detail="Product with this SKU already exists")
     
-    # Update fields
-    update_data = product.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(existing_product, field, value)
+    # Update fields; an explicit null SKU leaves the current one in place
+    for field in product.__fields_set__:
+        if field == "sku" and product.sku is None:
+            continue
+        setattr(existing_product, field, getattr(product, field))
     
+    # Keep the SKU index in sync
+    if existing_product.sku != old_sku:
+        del sku_index[old_sku]
+        sku_index[existing_product.sku] = product_id
+    
+    products_json[product_id] = existing_product.dict()
     return existing_product
 
 @app.delete("/products/{product_id}", status_code=204, tags=["Products"])
@@ -143,15 +189,15 @@ async def delete_product(product_id: int):
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Check if product has associated orders
-    for order in orders_db.values():
-        if order.product_id == product_id:
-            raise HTTPException(status_code=400, detail="Cannot delete product with existing orders")
+    if product_order_counts[product_id]:
+        raise HTTPException(status_code=400, detail="Cannot delete product with existing orders")
     
-    del products_db[product_id]
+    del sku_index[products_db.pop(product_id).sku]
+    del products_json[product_id]
     return None
 
 # Order endpoints
-@app.post("/orders", response_model=OrderResponse, status_code=201, tags=["Orders"])
+@app.post("/orders", status_code=201, responses={201: {"model": OrderResponse}}, tags=["Orders"])
 async def create_order(order: OrderCreate):
     """Create a new order with automatic stock reduction"""
     global order_counter
@@ -169,30 +215,78 @@ async def create_order(order: OrderCreate):
     
     # Reduce stock atomically
     product.stock -= order.quantity
+    products_json[order.product_id] = product.dict()
     
     # Create order
     order_counter += 1
-    new_order = Order(
+    new_order = Order.construct(
         id=order_counter,
         product_id=order.product_id,
         quantity=order.quantity,
         status=OrderStatus.PENDING,
-        created_at=datetime.utcnow()
+        created_at=datetime.now(timezone.utc)
     )
     orders_db[order_counter] = new_order
-    return new_order
+    orders_json[order_counter] = new_order.dict()
+    product_order_counts[order.product_id] += 1
+    return ORJSONResponse(orders_json[order_counter], status_code=201)
 
-@app.get("/orders", response_model=List[OrderResponse], tags=["Orders"])
+@app.post("/orders:batch", status_code=201, responses={201: {"model": List[OrderResponse]}}, tags=["Orders"])
+async def create_orders_batch(orders: List[OrderCreate]):
+    """Create several orders in one request; nothing is created if any order fails"""
+    global order_counter
+    
+    # Check every product once against the total quantity requested for it
+    requested = Counter()
+    for order in orders:
+        requested[order.product_id] += order.quantity
+    for product_id, quantity in requested.items():
+        if product_id not in products_db:
+            raise HTTPException(status_code=404, detail="Product not found")
+        product = products_db[product_id]
+        if product.stock < quantity:
+            raise HTTPException(
+                status_code=409, 
+                detail=f"Insufficient stock for product {product_id}. Available: {product.stock}, Requested: {quantity}"
+            )
+    
+    # Reduce stock
+    for product_id, quantity in requested.items():
+        product = products_db[product_id]
+        product.stock -= quantity
+        products_json[product_id] = product.dict()
+    product_order_counts.update(Counter(order.product_id for order in orders))
+    
+    # Create orders
+    created_at = datetime.now(timezone.utc)
+    new_orders = {
+        order_id: Order.construct(
+            id=order_id,
+            product_id=order.product_id,
+            quantity=order.quantity,
+            status=OrderStatus.PENDING,
+            created_at=created_at
+        )
+        for order_id, order in enumerate(orders, start=order_counter + 1)
+    }
+    order_counter += len(orders)
+    
+    new_json = {order_id: o.dict() for order_id, o in new_orders.items()}
+    orders_db.update(new_orders)
+    orders_json.update(new_json)
+    return ORJSONResponse(list(new_json.values()), status_code=201)
+
+@app.get("/orders", responses={200: {"model": List[OrderResponse]}}, tags=["Orders"])
 async def get_orders():
     """List all orders"""
-    return list(orders_db.values())
+    return ORJSONResponse(list(orders_json.values()))
 
-@app.get("/orders/{order_id}", response_model=OrderResponse, tags=["Orders"])
+@app.get("/orders/{order_id}", responses={200: {"model": OrderResponse}}, tags=["Orders"])
 async def get_order(order_id: int):
     """Get a specific order by ID"""
     if order_id not in orders_db:
         raise HTTPException(status_code=404, detail="Order not found")
-    return orders_db[order_id]
+    return ORJSONResponse(orders_json[order_id])
 
 @app.put("/orders/{order_id}", response_model=OrderResponse, tags=["Orders"])
 async def update_order(order_id: int, order: OrderUpdate):
@@ -203,10 +297,10 @@ async def update_order(order_id: int, order: OrderUpdate):
     existing_order = orders_db[order_id]
     
     # Update fields
-    update_data = order.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(existing_order, field, value)
+    for field in order.__fields_set__:
+        setattr(existing_order, field, getattr(order, field))
     
+    orders_json[order_id] = existing_order.dict()
     return existing_order
 
 # Webhook endpoints
@@ -216,20 +310,17 @@ async def process_payment_webhook(
     x_webhook_signature: str = Header(..., alias="X-Webhook-Signature")
 ):
     """Process payment webhook with HMAC verification"""
-    webhook_secret = os.getenv("WEBHOOK_SECRET", "webhook-secret-key")
-    
     # Get raw payload
     payload = await request.body()
     
     # Verify signature
-    if not verify_webhook_signature(x_webhook_signature, payload, webhook_secret):
+    if not verify_webhook_signature(x_webhook_signature, payload):
         raise HTTPException(status_code=403, detail="Invalid webhook signature")
     
     # Parse payload
     try:
-        data = json.loads(payload)
-        webhook_data = PaymentWebhook(**data)
-    except (json.JSONDecodeError, ValueError) as e:
+        webhook_data = msgspec.json.decode(payload, type=PaymentWebhookMsg)
+    except msgspec.DecodeError as e:
         raise HTTPException(status_code=422, detail=f"Invalid payload: {str(e)}")
     
     # Process payment
@@ -240,6 +331,7 @@ async def process_payment_webhook(
     
     if webhook_data.event_type == "payment.succeeded":
         order.status = OrderStatus.PAID
+        orders_json[webhook_data.order_id] = order.dict()
         return {
             "status": "processed",
             "order_id": webhook_data.order_id,
@@ -252,11 +344,18 @@ async def process_payment_webhook(
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Global exception handler for consistent error responses"""
-    return {
-        "detail": exc.detail,
-        "status_code": exc.status_code
-    }
+    return ORJSONResponse({"detail": exc.detail, "status_code": exc.status_code}, status_code=exc.status_code)
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8007)
+    # uvloop has no Windows build, fall back to the stdlib loop there
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    port = int(os.environ.get("PORT", 8007))
+    # Each worker is a separate process with its own in-memory store, so keep
+    # WEB_CONCURRENCY at 1 until storage moves to a shared database
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    uvicorn.run(
+        "app.main:app", host="0.0.0.0", port=port, workers=workers,
+        loop=loop, http="httptools", log_level="warning"
+    )
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+import msgspec
 from pydantic import BaseModel, Field, validator
 
 # For older Pydantic compatibility, use simple in-memory storage instead of SQLModel
@@ -99,5 +100,14 @@ class PaymentWebhook(BaseModel):
         return v or datetime.utcnow()
 
 
+# Decoded straight from the raw body on the webhook hot path
+class PaymentWebhookMsg(msgspec.Struct):
+    event_type: str
+    order_id: int
+    amount: float
+    payment_id: str = "pay_123"
+    timestamp: Optional[datetime] = None
+
+
 class ErrorResponse(BaseModel):
     detail: str
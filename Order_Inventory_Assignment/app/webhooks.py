@@ -1,6 +1,6 @@
 import os
 import hmac
-import hashlib
+import orjson
 from fastapi import HTTPException, Request, Header
 from app.models import PaymentWebhook, OrderStatus
 from app.crud import OrderCRUD
@@ -12,15 +12,12 @@ class WebhookHandler:
     
     def __init__(self):
         self.webhook_secret = os.getenv("WEBHOOK_SECRET", "your-webhook-secret-key")
+        self._secret_bytes = self.webhook_secret.encode()
         self.processed_events = set()  # Simple replay protection
     
     def verify_signature(self, payload: bytes, signature: str) -> bool:
         """Verify HMAC-SHA256 signature"""
-        expected_signature = hmac.new(
-            self.webhook_secret.encode(),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
+        expected_signature = hmac.digest(self._secret_bytes, payload, 'sha256').hex()
         
         # Remove 'sha256=' prefix if present
         if signature.startswith('sha256='):
@@ -54,7 +51,7 @@ class WebhookHandler:
         
         # Parse webhook data
         try:
-            webhook_data = PaymentWebhook.parse_raw(body)
+            webhook_data = PaymentWebhook.parse_obj(orjson.loads(body))
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
         
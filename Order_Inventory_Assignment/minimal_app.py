@@ -1,87 +1,156 @@
 #!/usr/bin/env python3
 """
 Ultra-minimal FastAPI server for maximum compatibility
-No advanced Pydantic features, works with any Python version
+Models are msgspec structs rather than Pydantic, so it runs on any pydantic version
 """
 
 import os
 import sys
 import hmac
 import hashlib
-import base64
-import json
+import gzip
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any, Tuple
 
 try:
-    from fastapi import FastAPI, HTTPException, Request, Header
-    from pydantic import BaseModel
+    from fastapi import FastAPI, HTTPException, Request, Response
+    from fastapi.responses import ORJSONResponse
     from enum import Enum
+    import msgspec
     import uvicorn
 except ImportError as e:
     print(f"❌ Import error: {e}")
     sys.exit(1)
 
-# Simple models without any validation decorators
+# Plain msgspec structs: decoded and encoded in C, no Pydantic validation pass.
+# Stored structs hold only scalars, so they opt out of GC tracking (gc=False).
 class OrderStatus(str, Enum):
     PENDING = "PENDING"
     PAID = "PAID"
     SHIPPED = "SHIPPED"
     CANCELED = "CANCELED"
 
-class ProductCreate(BaseModel):
+# Interned constants for the per-request status/event comparisons
+STATUS_PENDING = sys.intern(OrderStatus.PENDING.value)
+STATUS_PAID = sys.intern(OrderStatus.PAID.value)
+EVENT_PAYMENT_SUCCEEDED = sys.intern("payment.succeeded")
+
+class ProductCreate(msgspec.Struct):
     sku: str
     name: str
-    price: float
-    stock: int
+    price: Annotated[float, msgspec.Meta(gt=0)]
+    stock: Annotated[int, msgspec.Meta(ge=0)]
 
-class Product(BaseModel):
+class Product(msgspec.Struct, gc=False):
     id: int
     sku: str
     name: str
     price: float
     stock: int
 
-class OrderCreate(BaseModel):
+class OrderCreate(msgspec.Struct):
     product_id: int
-    quantity: int
-    status: str = "PENDING"
+    quantity: Annotated[int, msgspec.Meta(gt=0)]
+    status: str = STATUS_PENDING
 
-class Order(BaseModel):
+class Order(msgspec.Struct, gc=False):
     id: int
     product_id: int
     quantity: int
     status: str
-    created_at: datetime
+    created_at: int  # Unix epoch in nanoseconds
 
-class PaymentWebhook(BaseModel):
+class PaymentWebhook(msgspec.Struct):
     event_type: str
     order_id: int
-    payment_id: str = "pay_123"
     amount: float
+    payment_id: str = "pay_123"
     timestamp: Optional[datetime] = None
 
 # Storage
 products_db: Dict[int, Product] = {}
+sku_index: Dict[str, int] = {}  # sku -> product id
 orders_db: Dict[int, Order] = {}
+# Insertion-ordered views for the list endpoints, appended to on create
+products_list: List[Product] = []
+orders_list: List[Order] = []
 product_counter = 0
 order_counter = 0
+# Bumped on every product change; GET /products serves a cached body and a
+# matching weak ETag until the next bump. The gzipped body is filled in the
+# first time a gzip client asks for that version.
+products_version = 0
+# Versions restart at 0 in every process, so tags carry a per-process token
+# to keep a restarted or sibling worker from matching a stale tag
+_BOOT_ID = time.time_ns()
+products_body_cache: Tuple[int, bytes, Optional[bytes]] = (-1, b"", None)
+
+def bump_products_version():
+    global products_version
+    products_version += 1
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison over the comma-separated list, as If-None-Match requires
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == opaque:
+            return True
+    return False
 
 # FastAPI App
 app = FastAPI(
     title="Orders & Inventory Microservice",
     version="1.0.0",
-    description="A simple microservice for managing products and orders"
+    description="A simple microservice for managing products and orders",
+    default_response_class=ORJSONResponse
 )
 
+# JSON helpers
+json_encoder = msgspec.json.Encoder()
+# Only the list GETs compress; smaller bodies go out as-is
+GZIP_MINIMUM_SIZE = 500
+GZIP_LEVEL = 6
+
+async def decode_body(request: Request, model: type):
+    try:
+        return msgspec.json.decode(await request.body(), type=model)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    return Response(json_encoder.encode(content), status_code=status_code, media_type="application/json")
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    # Match gzip as a coding token; an explicit q=0 means the client refuses it
+    for token in accept_encoding.split(","):
+        coding, *params = token.split(";")
+        if coding.strip().lower() != "gzip":
+            continue
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
 # Webhook security
-def verify_webhook_signature(signature: str, payload: bytes, secret: str) -> bool:
+WEBHOOK_SECRET_BYTES = os.getenv("WEBHOOK_SECRET", "webhook-secret-key").encode()
+# Keyed once; each request copies it instead of redoing the ipad/opad setup
+_WEBHOOK_HMAC_PROTO = hmac.new(WEBHOOK_SECRET_BYTES, digestmod=hashlib.sha256)
+
+def verify_webhook_signature(signature: str, payload: bytes) -> bool:
     if not signature.startswith('sha256='):
         return False
-    expected_signature = hmac.new(secret.encode(), payload, hashlib.sha256).digest()
-    expected_signature_b64 = base64.b64encode(expected_signature).decode()
-    provided_signature = signature[7:]
-    return hmac.compare_digest(expected_signature_b64, provided_signature)
+    mac = _WEBHOOK_HMAC_PROTO.copy()
+    mac.update(payload)
+    return hmac.compare_digest(mac.hexdigest(), signature[7:])
 
 # Routes
 @app.get("/")
@@ -98,100 +167,149 @@ async def health_check():
     }
 
 @app.post("/products", status_code=201)
-async def create_product(product: ProductCreate):
+async def create_product(request: Request):
     global product_counter
-    
-    # Manual validation
-    if product.price <= 0:
-        raise HTTPException(status_code=422, detail="Price must be greater than 0")
-    if product.stock < 0:
-        raise HTTPException(status_code=422, detail="Stock cannot be negative")
+    product = await decode_body(request, ProductCreate)
     
     # Check duplicate SKU
-    for existing_product in products_db.values():
-        if existing_product.sku == product.sku:
-            raise HTTPException(status_code=409, detail="Product with this SKU already exists")
+    if product.sku in sku_index:
+        raise HTTPException(status_code=409, detail="Product with this SKU already exists")
     
     product_counter += 1
+    sku = sys.intern(product.sku)
     new_product = Product(
         id=product_counter,
-        sku=product.sku,
+        sku=sku,
         name=product.name,
         price=product.price,
         stock=product.stock
     )
     products_db[product_counter] = new_product
-    return new_product
+    sku_index[sku] = product_counter
+    products_list.append(new_product)
+    bump_products_version()
+    return json_response(new_product, status_code=201)
 
+@app.post("/products/bulk", status_code=201)
+async def create_products_bulk(request: Request):
+    global product_counter
+    products = await decode_body(request, List[ProductCreate])
+    
+    # All-or-nothing: reject the batch on any duplicate SKU, in or out of it
+    skus = [sys.intern(product.sku) for product in products]
+    if len(set(skus)) != len(skus) or any(sku in sku_index for sku in skus):
+        raise HTTPException(status_code=409, detail="Product with this SKU already exists")
+    
+    first_id = product_counter + 1
+    product_counter += len(products)
+    new_products = [
+        Product(id=product_id, sku=sku, name=product.name, price=product.price, stock=product.stock)
+        for product_id, sku, product in zip(range(first_id, product_counter + 1), skus, products)
+    ]
+    for new_product in new_products:
+        products_db[new_product.id] = new_product
+        sku_index[new_product.sku] = new_product.id
+    products_list.extend(new_products)
+    bump_products_version()
+    return json_response(new_products, status_code=201)
+
+# The list endpoints encode the whole collection, which grows with the data,
+# so they are plain def and run in the threadpool instead of on the event
+# loop. O(1) handlers stay async def; the POST handlers must await the body.
 @app.get("/products")
-async def get_products():
-    return list(products_db.values())
+def get_products(request: Request):
+    global products_body_cache
+    version = products_version
+    etag = f'W/"{_BOOT_ID}-v{version}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    cached_version, body, gzipped = products_body_cache
+    if cached_version != version:
+        body, gzipped = json_encoder.encode(products_list), None
+    if len(body) >= GZIP_MINIMUM_SIZE and accepts_gzip(request.headers.get("accept-encoding", "")):
+        if gzipped is None:
+            gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        products_body_cache = (version, body, gzipped)
+        headers["Content-Encoding"] = "gzip"
+        return Response(gzipped, media_type="application/json", headers=headers)
+    products_body_cache = (version, body, gzipped)
+    return Response(body, media_type="application/json", headers=headers)
 
 @app.get("/products/{product_id}")
 async def get_product(product_id: int):
     if product_id not in products_db:
         raise HTTPException(status_code=404, detail="Product not found")
-    return products_db[product_id]
+    return json_response(products_db[product_id])
 
 @app.post("/orders", status_code=201)
-async def create_order(order: OrderCreate):
+async def create_order(request: Request):
     global order_counter
-    
-    # Manual validation
-    if order.quantity <= 0:
-        raise HTTPException(status_code=422, detail="Quantity must be greater than 0")
+    order = await decode_body(request, OrderCreate)
     
     if order.product_id not in products_db:
         raise HTTPException(status_code=404, detail="Product not found")
     
     product = products_db[order.product_id]
+    # No await from the stock check to the insert, so this runs atomically
     if product.stock < order.quantity:
         raise HTTPException(status_code=409, detail=f"Insufficient stock. Available: {product.stock}")
     
     # Update stock
     product.stock -= order.quantity
+    bump_products_version()
     
     order_counter += 1
     new_order = Order(
         id=order_counter,
         product_id=order.product_id,
         quantity=order.quantity,
-        status="PENDING",
-        created_at=datetime.utcnow()
+        status=STATUS_PENDING,
+        created_at=time.time_ns()
     )
     orders_db[order_counter] = new_order
-    return new_order
+    orders_list.append(new_order)
+    return json_response(new_order, status_code=201)
 
 @app.get("/orders")
-async def get_orders():
-    return list(orders_db.values())
+def get_orders(request: Request):
+    # Orders change on every create and payment, so there is no per-version
+    # cache here; the body is encoded and compressed per request
+    body = json_encoder.encode(orders_list)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MINIMUM_SIZE and accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return Response(body, media_type="application/json", headers=headers)
 
 @app.get("/orders/{order_id}")
 async def get_order(order_id: int):
     if order_id not in orders_db:
         raise HTTPException(status_code=404, detail="Order not found")
-    return orders_db[order_id]
+    return json_response(orders_db[order_id])
 
 @app.post("/webhooks/payment")
-async def process_payment_webhook(request: Request, x_webhook_signature: str = Header(..., alias="X-Webhook-Signature")):
-    webhook_secret = os.getenv("WEBHOOK_SECRET", "webhook-secret-key")
+async def process_payment_webhook(request: Request):
+    signature = request.headers.get("x-webhook-signature")
+    if not signature:
+        raise HTTPException(status_code=401, detail="Missing webhook signature")
     payload = await request.body()
     
-    if not verify_webhook_signature(x_webhook_signature, payload, webhook_secret):
+    if not verify_webhook_signature(signature, payload):
         raise HTTPException(status_code=403, detail="Invalid webhook signature")
     
     try:
-        data = json.loads(payload)
-        webhook_data = PaymentWebhook(**data)
-    except Exception as e:
+        webhook_data = msgspec.json.decode(payload, type=PaymentWebhook)
+    except msgspec.DecodeError as e:
         raise HTTPException(status_code=422, detail=f"Invalid payload: {str(e)}")
     
     if webhook_data.order_id not in orders_db:
         raise HTTPException(status_code=404, detail="Order not found")
     
     order = orders_db[webhook_data.order_id]
-    if webhook_data.event_type == "payment.succeeded":
-        order.status = "PAID"
+    if webhook_data.event_type == EVENT_PAYMENT_SUCCEEDED:
+        order.status = STATUS_PAID
         return {"status": "processed", "order_id": webhook_data.order_id, "new_status": order.status}
     
     return {"status": "ignored", "reason": f"Unhandled event type: {webhook_data.event_type}"}
@@ -199,4 +317,10 @@ async def process_payment_webhook(request: Request, x_webhook_signature: str = H
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8007))
     print(f"🚀 Starting ultra-compatible FastAPI server on 0.0.0.0:{port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # uvloop has no Windows build, fall back to the stdlib loop there. Under
+    # gunicorn, uvicorn.workers.UvicornWorker picks up uvloop on its own.
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    uvicorn.run(
+        app, host="0.0.0.0", port=port, loop=loop, http="httptools",
+        interface="asgi3", log_level="warning", access_log=False
+    )
@@ -18,22 +18,23 @@ class OrdersInventoryUser(HttpUser):
         """Create test products for this user"""
         self.products = []
         
-        # Create 3 test products
-        for i in range(3):
-            product_data = {
+        # Create 3 test products in one request
+        products_data = [
+            {
                 "sku": f"LOAD-{random.randint(10000, 99999)}-{i}",
                 "name": f"Load Test Product {i}",
                 "price": round(random.uniform(10, 100), 2),
                 "stock": random.randint(50, 200)
             }
-            
-            with self.client.post("/products", json=product_data, catch_response=True) as response:
-                if response.status_code == 201:
-                    product = response.json()
-                    self.products.append(product)
-                    response.success()
-                else:
-                    response.failure(f"Failed to create product: {response.status_code}")
+            for i in range(3)
+        ]
+        
+        with self.client.post("/products/bulk", json=products_data, catch_response=True) as response:
+            if response.status_code == 201:
+                self.products.extend(response.json())
+                response.success()
+            else:
+                response.failure(f"Failed to create products: {response.status_code}")
     
     @task(40)  # 40% of requests
     def get_products(self):
@@ -126,18 +127,19 @@ class HeavyUser(HttpUser):
         """Create products with limited stock for stress testing"""
         self.products = []
         
-        for i in range(2):
-            product_data = {
+        products_data = [
+            {
                 "sku": f"STRESS-{random.randint(10000, 99999)}-{i}",
                 "name": f"Stress Test Product {i}",
                 "price": round(random.uniform(5, 50), 2),
                 "stock": random.randint(5, 20)  # Lower stock for stress testing
             }
-            
-            with self.client.post("/products", json=product_data, catch_response=True) as response:
-                if response.status_code == 201:
-                    product = response.json()
-                    self.products.append(product)
+            for i in range(2)
+        ]
+        
+        with self.client.post("/products/bulk", json=products_data, catch_response=True) as response:
+            if response.status_code == 201:
+                self.products.extend(response.json())
     
     @task(60)
     def rapid_order_creation(self):
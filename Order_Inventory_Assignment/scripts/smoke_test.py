@@ -6,10 +6,10 @@ Tests basic functionality and validates responses
 
 import requests
 import os
-import json
+import orjson
 import hmac
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Configuration
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8007")
@@ -19,10 +19,13 @@ def test_api():
     """Run comprehensive smoke tests"""
     print(f"🚀 Starting smoke tests against: {BASE_URL}")
     
+    # Reuse one keep-alive connection for every request
+    session = requests.Session()
+    
     try:
         # Test 1: Health check
         print("\n📋 Test 1: Health Check")
-        response = requests.get(f"{BASE_URL}/health")
+        response = session.get(f"{BASE_URL}/health")
         assert response.status_code == 200, f"Health check failed: {response.status_code}"
         print(f"✅ Health check passed: {response.json()}")
         
@@ -34,7 +37,7 @@ def test_api():
             "price": 29.99,
             "stock": 100
         }
-        response = requests.post(f"{BASE_URL}/products", json=product_data)
+        response = session.post(f"{BASE_URL}/products", json=product_data)
         assert response.status_code == 201, f"Product creation failed: {response.status_code}"
         product = response.json()
         product_id = product["id"]
@@ -42,7 +45,7 @@ def test_api():
         
         # Test 3: Get product
         print("\n📋 Test 3: Get Product")
-        response = requests.get(f"{BASE_URL}/products/{product_id}")
+        response = session.get(f"{BASE_URL}/products/{product_id}")
         assert response.status_code == 200, f"Get product failed: {response.status_code}"
         retrieved_product = response.json()
         assert retrieved_product["sku"] == "TEST-001"
@@ -54,7 +57,7 @@ def test_api():
             "product_id": product_id,
             "quantity": 2
         }
-        response = requests.post(f"{BASE_URL}/orders", json=order_data)
+        response = session.post(f"{BASE_URL}/orders", json=order_data)
         assert response.status_code == 201, f"Order creation failed: {response.status_code}"
         order = response.json()
         order_id = order["id"]
@@ -62,7 +65,7 @@ def test_api():
         
         # Test 5: Verify stock reduction
         print("\n📋 Test 5: Verify Stock Reduction")
-        response = requests.get(f"{BASE_URL}/products/{product_id}")
+        response = session.get(f"{BASE_URL}/products/{product_id}")
         updated_product = response.json()
         expected_stock = 100 - 2  # Original stock minus order quantity
         assert updated_product["stock"] == expected_stock, f"Stock not reduced: {updated_product['stock']}"
@@ -75,11 +78,11 @@ def test_api():
             "order_id": order_id,
             "payment_id": f"pay_{datetime.now().timestamp()}",
             "amount": 59.98,  # 2 * 29.99
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": datetime.now(timezone.utc)
         }
         
         # Generate HMAC signature
-        payload_bytes = json.dumps(webhook_payload).encode()
+        payload_bytes = orjson.dumps(webhook_payload)
         signature = hmac.new(
             WEBHOOK_SECRET.encode(),
             payload_bytes,
@@ -91,7 +94,7 @@ def test_api():
             "X-Webhook-Signature": f"sha256={signature}"
         }
         
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/webhooks/payment",
             data=payload_bytes,
             headers=headers
@@ -102,7 +105,7 @@ def test_api():
         
         # Test 7: Verify order status updated
         print("\n📋 Test 7: Verify Order Status Updated")
-        response = requests.get(f"{BASE_URL}/orders/{order_id}")
+        response = session.get(f"{BASE_URL}/orders/{order_id}")
         updated_order = response.json()
         assert updated_order["status"] == "PAID", f"Order status not updated: {updated_order['status']}"
         print(f"✅ Order status updated to: {updated_order['status']}")
@@ -115,12 +118,12 @@ def test_api():
             "product_id": product_id,
             "quantity": 200  # More than available stock
         }
-        response = requests.post(f"{BASE_URL}/orders", json=large_order)
+        response = session.post(f"{BASE_URL}/orders", json=large_order)
         assert response.status_code == 409, f"Should fail with insufficient stock: {response.status_code}"
         print(f"✅ Insufficient stock error handled correctly")
         
         # Try to get non-existent product
-        response = requests.get(f"{BASE_URL}/products/99999")
+        response = session.get(f"{BASE_URL}/products/99999")
         assert response.status_code == 404, f"Should return 404 for non-existent product: {response.status_code}"
         print(f"✅ 404 error handled correctly")
         
@@ -128,14 +131,14 @@ def test_api():
         print("\n📋 Test 9: List Resources")
         
         # List products
-        response = requests.get(f"{BASE_URL}/products")
+        response = session.get(f"{BASE_URL}/products")
         assert response.status_code == 200
         products = response.json()
         assert len(products) >= 1
         print(f"✅ Listed {len(products)} products")
         
         # List orders
-        response = requests.get(f"{BASE_URL}/orders")
+        response = session.get(f"{BASE_URL}/orders")
         assert response.status_code == 200
         orders = response.json()
         assert len(orders) >= 1
@@ -155,6 +158,8 @@ def test_api():
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         return False
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
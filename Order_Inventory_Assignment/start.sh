@@ -0,0 +1,12 @@
+#!/usr/bin/env sh
+# Production entrypoint: gunicorn supervising uvicorn workers for minimal_app.
+#
+# products_db/orders_db live in each worker's memory, so WEB_CONCURRENCY must
+# stay at 1 until storage moves to a shared backend.
+# TODO: back the store with Redis/Postgres, then raise WEB_CONCURRENCY to
+# about 2 * cores + 1.
+exec gunicorn minimal_app:app \
+    -k uvicorn.workers.UvicornWorker \
+    -w "${WEB_CONCURRENCY:-1}" \
+    -b "0.0.0.0:${PORT:-8007}" \
+    --log-level warning
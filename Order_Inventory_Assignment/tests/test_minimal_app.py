@@ -0,0 +1,129 @@
+import hmac
+import hashlib
+import json
+import pytest
+from fastapi.testclient import TestClient
+import minimal_app
+from minimal_app import app
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def reset_data():
+    """Reset the module-level store before each test"""
+    minimal_app.products_db.clear()
+    minimal_app.sku_index.clear()
+    minimal_app.orders_db.clear()
+    minimal_app.products_list.clear()
+    minimal_app.orders_list.clear()
+    minimal_app.product_counter = 0
+    minimal_app.order_counter = 0
+    minimal_app.bump_products_version()
+    yield
+
+def sign(payload: bytes) -> str:
+    digest = hmac.new(minimal_app.WEBHOOK_SECRET_BYTES, payload, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+def create_order() -> int:
+    product_data = {
+        "sku": "HOOK-001",
+        "name": "Webhook Product",
+        "price": 10.0,
+        "stock": 5
+    }
+    product_id = client.post("/products", json=product_data).json()["id"]
+    response = client.post("/orders", json={"product_id": product_id, "quantity": 1})
+    return response.json()["id"]
+
+def test_payment_webhook_hex_signature():
+    """Test that a hex-signed payment webhook marks the order paid"""
+    order_id = create_order()
+    payload = json.dumps({"event_type": "payment.succeeded", "order_id": order_id, "amount": 10.0}).encode()
+
+    response = client.post(
+        "/webhooks/payment",
+        data=payload,
+        headers={"X-Webhook-Signature": sign(payload)}
+    )
+    assert response.status_code == 200
+    assert response.json()["new_status"] == "PAID"
+
+def test_payment_webhook_bad_signature():
+    """Test that a webhook with a wrong signature is rejected"""
+    order_id = create_order()
+    payload = json.dumps({"event_type": "payment.succeeded", "order_id": order_id, "amount": 10.0}).encode()
+
+    response = client.post(
+        "/webhooks/payment",
+        data=payload,
+        headers={"X-Webhook-Signature": sign(b"something else")}
+    )
+    assert response.status_code == 403
+
+def test_payment_webhook_missing_signature():
+    """Test that a webhook without a signature header is rejected"""
+    payload = json.dumps({"event_type": "payment.succeeded", "order_id": 1, "amount": 10.0}).encode()
+
+    response = client.post("/webhooks/payment", data=payload)
+    assert response.status_code == 401
+
+def test_bulk_products_duplicate_sku_in_batch():
+    """Test that a bulk create repeating a SKU within the batch creates nothing"""
+    products_data = [
+        {"sku": "BULK-001", "name": "First", "price": 1.0, "stock": 1},
+        {"sku": "BULK-001", "name": "Second", "price": 2.0, "stock": 2}
+    ]
+    response = client.post("/products/bulk", json=products_data)
+    assert response.status_code == 409
+
+    assert client.get("/products").json() == []
+
+def test_get_products_not_modified():
+    """Test that revalidating GET /products answers 304 until a product changes"""
+    product_data = {"sku": "ETAG-001", "name": "ETag Product", "price": 3.0, "stock": 4}
+    client.post("/products", json=product_data)
+
+    response = client.get("/products")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get("/products", headers={"If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert client.get("/products", headers={"If-None-Match": "*"}).status_code == 304
+
+    product_data["sku"] = "ETAG-002"
+    client.post("/products", json=product_data)
+    response = client.get("/products", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+def test_get_products_gzip_negotiation():
+    """Test that GET /products is gzipped only when the client accepts gzip"""
+    for i in range(10):
+        product_data = {"sku": f"GZIP-{i:03}", "name": "Gzip Product", "price": 1.0, "stock": 1}
+        client.post("/products", json=product_data)
+
+    response = client.get("/products", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 10
+
+    response = client.get("/products", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 10
+
+def test_get_orders_gzip():
+    """Test that a large GET /orders is gzipped for clients that accept it"""
+    product_data = {"sku": "GZIP-ORDERS", "name": "Gzip Product", "price": 1.0, "stock": 100}
+    product_id = client.post("/products", json=product_data).json()["id"]
+    for _ in range(10):
+        client.post("/orders", json={"product_id": product_id, "quantity": 1})
+
+    response = client.get("/orders", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 10
+
+    response = client.get("/orders", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
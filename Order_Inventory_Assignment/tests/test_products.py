@@ -148,3 +148,81 @@ def test_invalid_stock():
     }
     response = client.post("/products", json=product_data)
     assert response.status_code == 422
+
+def test_create_products_batch():
+    """Test creating several products in one request"""
+    products_data = [
+        {"sku": "BATCH-001", "name": "Batch Product 1", "price": 10.0, "stock": 5},
+        {"sku": "BATCH-002", "name": "Batch Product 2", "price": 12.5, "stock": 8}
+    ]
+    response = client.post("/products:batch", json=products_data)
+    assert response.status_code == 201
+    data = response.json()
+    assert [p["sku"] for p in data] == ["BATCH-001", "BATCH-002"]
+    assert data[1]["id"] == data[0]["id"] + 1
+    
+    # Each product is retrievable on its own
+    response = client.get(f"/products/{data[1]['id']}")
+    assert response.status_code == 200
+    assert response.json()["stock"] == 8
+
+def test_update_product_null_sku_keeps_sku():
+    """Test that an explicit null SKU does not clear or free the SKU"""
+    product_data = {
+        "sku": "NULLSKU-001",
+        "name": "Null SKU Product",
+        "price": 10.0,
+        "stock": 5
+    }
+    response = client.post("/products", json=product_data)
+    product_id = response.json()["id"]
+    
+    response = client.put(f"/products/{product_id}", json={"sku": None, "stock": 7})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["sku"] == "NULLSKU-001"
+    assert data["stock"] == 7
+
+def test_create_orders_batch_over_stock_is_all_or_nothing():
+    """Test that a batch whose orders together exceed stock creates nothing"""
+    product_data = {
+        "sku": "BATCH-ORDER-001",
+        "name": "Batch Order Product",
+        "price": 5.0,
+        "stock": 5
+    }
+    product_id = client.post("/products", json=product_data).json()["id"]
+    orders_before = len(client.get("/orders").json())
+    
+    # Each order fits on its own, together they need 6 of 5
+    orders_data = [
+        {"product_id": product_id, "quantity": 3},
+        {"product_id": product_id, "quantity": 3}
+    ]
+    response = client.post("/orders:batch", json=orders_data)
+    assert response.status_code == 409
+    
+    assert len(client.get("/orders").json()) == orders_before
+    assert client.get(f"/products/{product_id}").json()["stock"] == 5
+
+def test_create_orders_batch_decrements_summed_quantity():
+    """Test that a valid batch reduces stock by the total quantity per product"""
+    product_data = {
+        "sku": "BATCH-ORDER-002",
+        "name": "Batch Order Product",
+        "price": 5.0,
+        "stock": 10
+    }
+    product_id = client.post("/products", json=product_data).json()["id"]
+    
+    orders_data = [
+        {"product_id": product_id, "quantity": 3},
+        {"product_id": product_id, "quantity": 4}
+    ]
+    response = client.post("/orders:batch", json=orders_data)
+    assert response.status_code == 201
+    data = response.json()
+    assert [o["quantity"] for o in data] == [3, 4]
+    assert all(o["status"] == "PENDING" for o in data)
+    
+    assert client.get(f"/products/{product_id}").json()["stock"] == 3